@@ -0,0 +1,152 @@
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+# Rough token estimate: ~4 characters per token for English text
+CHARS_PER_TOKEN = 4
+
+# Turns (user + assistant messages) always kept verbatim, regardless of budget
+MIN_RECENT_TURNS = 2
+
+TICKET_NUMBER_PATTERN = re.compile(r"CHG\d{7}")
+TABLE_ROW_PATTERN = re.compile(r"^\s*\|.*\|\s*$")
+
+
+def get_history_token_budget() -> int:
+    """Get the per-session token budget for conversation history."""
+    return int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "2000"))
+
+
+def get_session_ttl_seconds() -> int:
+    """Get how long an idle chat session is kept before it expires."""
+    return int(os.getenv("CHAT_SESSION_TTL_SECONDS", "3600"))
+
+
+def get_max_sessions() -> int:
+    """Get the maximum number of chat sessions held in memory."""
+    return int(os.getenv("CHAT_MAX_SESSIONS", "1000"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def dedupe_ticket_tables(content: str) -> str:
+    """Replace Markdown table rows that restate ticket data with a short reference.
+
+    Every ticket is already in the system context, so older answers only need to
+    remember which tickets they showed, not the full rows.
+    """
+    lines = content.split("\n")
+    kept = []
+    omitted = []
+    for line in lines:
+        numbers = TICKET_NUMBER_PATTERN.findall(line)
+        if numbers and TABLE_ROW_PATTERN.match(line):
+            omitted.extend(n for n in numbers if n not in omitted)
+            continue
+        if omitted and not TABLE_ROW_PATTERN.match(line):
+            kept.append(f"[table rows for {', '.join(omitted)} omitted - see ticket data]")
+            omitted = []
+        kept.append(line)
+    if omitted:
+        kept.append(f"[table rows for {', '.join(omitted)} omitted - see ticket data]")
+    return "\n".join(kept)
+
+
+class ConversationSession:
+    """Server-side chat history with a rolling summary of older turns."""
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.id = session_id or uuid.uuid4().hex
+        self.messages: list[dict] = []
+        self.summary: Optional[str] = None
+        self.last_used = time.monotonic()
+        self.compacting = False
+
+    def history_tokens(self) -> int:
+        """Estimate the prompt tokens used by the summary and verbatim turns."""
+        total = estimate_tokens(self.summary) if self.summary else 0
+        return total + sum(estimate_tokens(m["content"]) for m in self.messages)
+
+    def prompt_messages(self, new_message: str) -> list[dict]:
+        """Build the Converse API message list for the next turn."""
+        history = [
+            {"role": m["role"], "content": [{"text": m["content"]}]}
+            for m in self.messages
+        ]
+        history.append({"role": "user", "content": [{"text": new_message}]})
+        return history
+
+    def append_turn(self, user_message: str, assistant_message: str) -> None:
+        """Record a completed turn, trimming ticket tables from the previous answer."""
+        if self.messages and self.messages[-1]["role"] == "assistant":
+            self.messages[-1]["content"] = dedupe_ticket_tables(self.messages[-1]["content"])
+        self.messages.append({"role": "user", "content": user_message})
+        self.messages.append({"role": "assistant", "content": assistant_message})
+
+    def evictable_count(self, budget: Optional[int] = None) -> int:
+        """Count the oldest messages to fold into the summary so history fits the budget.
+
+        Turns are evicted in user/assistant pairs so the verbatim history still
+        starts with a user message, as the Converse API requires.
+        """
+        budget = budget if budget is not None else get_history_token_budget()
+        tokens = self.history_tokens()
+        evict_count = 0
+        while (
+            tokens > budget
+            and len(self.messages) - evict_count > MIN_RECENT_TURNS * 2
+        ):
+            tokens -= sum(estimate_tokens(m["content"]) for m in self.messages[evict_count:evict_count + 2])
+            evict_count += 2
+        return evict_count
+
+    def fold(self, summary: str, evict_count: int) -> None:
+        """Replace the oldest messages with a summary that covers them."""
+        self.summary = summary
+        self.messages = self.messages[evict_count:]
+
+
+class ConversationStore:
+    """In-memory chat sessions, evicting the least recently used and expired ones."""
+
+    def __init__(self):
+        self._sessions: OrderedDict[str, ConversationSession] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session: ConversationSession) -> None:
+        """Store a session once it has a turn worth keeping."""
+        with self._lock:
+            self._evict()
+            self._sessions[session.id] = session
+
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        """Look up a live session and mark it as recently used."""
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = time.monotonic()
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session, returning whether it existed."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self) -> None:
+        cutoff = time.monotonic() - get_session_ttl_seconds()
+        for session_id in [s.id for s in self._sessions.values() if s.last_used < cutoff]:
+            del self._sessions[session_id]
+        while len(self._sessions) >= get_max_sessions():
+            self._sessions.popitem(last=False)
+
+
+CONVERSATIONS = ConversationStore()
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+from app.models import ChangeTicket
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = [
+    "id",
+    "number",
+    "shortDescription",
+    "description",
+    "requestedBy",
+    "assignedTo",
+    "priority",
+    "status",
+    "createdAt",
+    "scheduledStartDate",
+    "scheduledEndDate",
+    "approvalChain",
+    "testingEvidence",
+    "rollbackPlan",
+    "changeWindow",
+    "complianceStatus",
+    "failedValidations",
+    "validationResults",
+]
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_SIZE = 10_000
+
+# Approximate size of each CSV/NDJSON chunk sent to the client; one chunk per
+# row would cost a thread-pool hop and an ASGI send for every ticket
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def flatten_ticket(ticket: ChangeTicket) -> dict:
+    """Flatten a ticket into a row of scalar values for tabular export."""
+    return {
+        "id": ticket.id,
+        "number": ticket.number,
+        "shortDescription": ticket.shortDescription,
+        "description": ticket.description,
+        "requestedBy": ticket.requestedBy,
+        "assignedTo": ticket.assignedTo,
+        "priority": ticket.priority,
+        "status": ticket.status,
+        "createdAt": ticket.createdAt,
+        "scheduledStartDate": ticket.scheduledStartDate,
+        "scheduledEndDate": ticket.scheduledEndDate,
+        "approvalChain": "; ".join(ticket.approvalChain) if ticket.approvalChain else None,
+        "testingEvidence": ticket.testingEvidence,
+        "rollbackPlan": ticket.rollbackPlan,
+        "changeWindow": ticket.changeWindow,
+        "complianceStatus": ticket.complianceStatus,
+        "failedValidations": "; ".join(r.rule for r in ticket.validationResults if not r.passed),
+        "validationResults": json.dumps([r.model_dump() for r in ticket.validationResults]),
+    }
+
+
+def _drain(buffer: io.StringIO) -> str:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def iter_csv(tickets: Iterable[ChangeTicket]) -> Iterator[str]:
+    """Yield a CSV export in chunks of roughly STREAM_CHUNK_SIZE characters."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+
+    writer.writeheader()
+    for ticket in tickets:
+        writer.writerow(flatten_ticket(ticket))
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield _drain(buffer)
+
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+def iter_ndjson(tickets: Iterable[ChangeTicket]) -> Iterator[str]:
+    """Yield one JSON document per ticket, including nested validation results, in chunks."""
+    buffer = io.StringIO()
+    for ticket in tickets:
+        buffer.write(ticket.model_dump_json())
+        buffer.write("\n")
+        if buffer.tell() >= STREAM_CHUNK_SIZE:
+            yield _drain(buffer)
+
+    if buffer.tell():
+        yield _drain(buffer)
+
+
+class _ParquetSink(io.BytesIO):
+    """In-memory sink that survives the Parquet writer closing it, so the footer can be drained."""
+
+    def close(self) -> None:
+        pass
+
+
+def iter_parquet(tickets: Iterable[ChangeTicket]) -> Iterator[bytes]:
+    """Yield a Parquet file in chunks, writing one row group per batch of tickets."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+    sink = _ParquetSink()
+
+    def drain() -> bytes:
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        batch = []
+        for ticket in tickets:
+            batch.append(flatten_ticket(ticket))
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                batch = []
+                yield drain()
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+    # Closing the writer appends the footer
+    yield drain()
+
+
+def parquet_available() -> bool:
+    """Check whether the optional pyarrow dependency is installed."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+EXPORT_WRITERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+    "parquet": iter_parquet,
+}
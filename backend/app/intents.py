@@ -0,0 +1,284 @@
+import re
+import threading
+from typing import Optional
+
+from app.models import ChangeTicket
+from app.mock_data import MOCK_TICKETS
+from app.routers.tickets import filter_tickets, get_stats
+
+STATUSES = ["Pending Approval", "Approved", "Rejected", "In Review"]
+PRIORITIES = ["Critical", "High", "Medium", "Low"]
+
+# Checked in order, so "non-compliant" wins over "compliant"
+COMPLIANCE_PATTERNS = [
+    ("non-compliant", re.compile(r"\bnon[- ]?compliant\b")),
+    ("warning", re.compile(r"\bwarnings?\b")),
+    ("compliant", re.compile(r"\bcompliant\b")),
+]
+
+TICKET_NUMBER_PATTERN = re.compile(r"\bchg\d{7}\b")
+COUNT_PATTERN = re.compile(r"^(how many|count|number of)\b")
+LIST_PATTERN = re.compile(r"^(show|list|which|what|find|get|display|give)\b")
+STATS_PATTERN = re.compile(r"\b(summary|statistics|stats|overview|breakdown)\b")
+DETAIL_PATTERN = re.compile(r"\b(why|details?|status|failing|fails?|wrong|issues?|problems?)\b")
+# "me" is only ignorable as the object of the request ("show me ..."); anywhere
+# else, as in "assigned to me", it names someone we cannot resolve
+REQUEST_OBJECT_PATTERN = re.compile(r"^(show|give) me\b")
+
+# Words a query may contain besides recognised entities and still be answered
+# locally; anything else means the question needs the model. Words that change
+# the meaning, such as "my", "we", "by" or a bare "priority" (sorting or grouping
+# rather than filtering), are deliberately absent.
+FILLER_WORDS = {
+    "a", "all", "an", "and", "any", "are", "assigned", "been", "change", "changes",
+    "compliance", "count", "currently", "display", "do", "does", "find", "for",
+    "get", "give", "has", "have", "how", "in", "is", "list", "many",
+    "number", "of", "on", "owned", "please", "show", "that", "the",
+    "there", "ticket", "tickets", "to", "total", "what", "which", "with",
+    "summary", "statistics", "stats", "overview", "breakdown", "dashboard",
+}
+DETAIL_WORDS = FILLER_WORDS | {
+    "details", "detail", "why", "status", "failing", "fail", "fails", "wrong",
+    "issue", "issues", "problem", "problems", "about", "info",
+}
+
+
+class RoutingMetrics:
+    """Counts how chat queries are routed between the local fast path and the model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.local = 0
+        self.model = 0
+        self.by_intent: dict[str, int] = {}
+
+    def record_local(self, intent: str) -> None:
+        with self._lock:
+            self.local += 1
+            self.by_intent[intent] = self.by_intent.get(intent, 0) + 1
+
+    def record_model(self) -> None:
+        with self._lock:
+            self.model += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            total = self.local + self.model
+            return {
+                "total": total,
+                "local": self.local,
+                "model": self.model,
+                "localHitRate": self.local / total if total else 0.0,
+                "byIntent": dict(self.by_intent),
+            }
+
+
+ROUTING_METRICS = RoutingMetrics()
+
+
+def _known_assignees() -> dict[str, str]:
+    """Map lowercase full names, and first names that are unique, to assignees."""
+    names = sorted({t.assignedTo for t in MOCK_TICKETS if t.assignedTo})
+    lookup = {name.lower(): name for name in names}
+    first_names: dict[str, list[str]] = {}
+    for name in names:
+        first_names.setdefault(name.split()[0].lower(), []).append(name)
+    for first, matches in first_names.items():
+        if len(matches) == 1 and first not in lookup:
+            lookup[first] = matches[0]
+    return lookup
+
+
+def _take(pattern: re.Pattern, text: str) -> tuple[bool, str]:
+    """Remove a pattern's matches from text, reporting whether it matched."""
+    stripped, count = pattern.subn(" ", text)
+    # Collapse the gap so later patterns see neighbouring words as adjacent
+    return count > 0, " ".join(stripped.split())
+
+
+def extract_entities(text: str) -> tuple[dict, str]:
+    """Pull ticket filters and numbers out of a normalised query.
+
+    Returns the entities found and the text left over once they are removed.
+    """
+    entities: dict = {"numbers": TICKET_NUMBER_PATTERN.findall(text)}
+    text = TICKET_NUMBER_PATTERN.sub(" ", text)
+
+    # Longest names first so "mike johnson" is not consumed as just "mike"
+    for key, name in sorted(_known_assignees().items(), key=lambda item: -len(item[0])):
+        found, text = _take(re.compile(rf"\b{re.escape(key)}(?:'s)?\b"), text)
+        if found:
+            entities["assignee"] = name
+            break
+
+    for status in STATUSES:
+        found, text = _take(re.compile(rf"\b{status.lower()}\b"), text)
+        if found:
+            entities["status"] = status
+            break
+
+    for compliance, pattern in COMPLIANCE_PATTERNS:
+        found, text = _take(pattern, text)
+        if found:
+            entities["compliance"] = compliance
+            break
+
+    # A bare level is ambiguous ("high compliance"), so it only counts as a
+    # priority when followed by "priority" or directly by "ticket(s)"
+    for priority in PRIORITIES:
+        found, text = _take(re.compile(rf"\b{priority.lower()}(?: priority\b|(?= tickets?\b))"), text)
+        if found:
+            entities["priority"] = priority
+            break
+
+    return entities, text
+
+
+def _leftover_words(text: str) -> set[str]:
+    return set(re.findall(r"[a-z0-9']+", text))
+
+
+def _describe_filters(entities: dict, count: int) -> str:
+    parts = []
+    if "compliance" in entities:
+        parts.append(entities["compliance"])
+    if "priority" in entities:
+        parts.append(f"{entities['priority']} priority")
+    description = " ".join(parts + ["ticket" if count == 1 else "tickets"])
+    if "status" in entities:
+        description += f" with status {entities['status']}"
+    if "assignee" in entities:
+        description += f" assigned to {entities['assignee']}"
+    return description
+
+
+def _ticket_table(tickets: list[ChangeTicket]) -> str:
+    rows = [
+        "| Ticket | Description | Assignee | Priority | Status | Compliance |",
+        "|--------|-------------|----------|----------|--------|------------|",
+    ]
+    for t in tickets:
+        rows.append(
+            f"| **{t.number}** | {t.shortDescription} | {t.assignedTo} | "
+            f"{t.priority} | {t.status} | {t.complianceStatus} |"
+        )
+    return "\n".join(rows)
+
+
+def _filter(entities: dict) -> list[ChangeTicket]:
+    return filter_tickets(
+        status=entities.get("status"),
+        priority=entities.get("priority"),
+        compliance=entities.get("compliance"),
+        assignee=entities.get("assignee"),
+    )
+
+
+def answer_count(entities: dict) -> str:
+    tickets = _filter(entities)
+    description = _describe_filters(entities, len(tickets))
+    answer = f"There {'is' if len(tickets) == 1 else 'are'} **{len(tickets)}** {description}."
+    if tickets:
+        answer += "\n\n" + _ticket_table(tickets)
+    return answer
+
+
+def answer_list(entities: dict) -> str:
+    tickets = _filter(entities)
+    description = _describe_filters(entities, len(tickets))
+    if not tickets:
+        return f"There are no {description}."
+    return f"## {description[0].upper()}{description[1:]} ({len(tickets)})\n\n{_ticket_table(tickets)}"
+
+
+def answer_stats() -> str:
+    stats = get_stats()
+    lines = [
+        "## Ticket Summary",
+        "",
+        "| Metric | Count |",
+        "|--------|-------|",
+        f"| Total tickets | {stats.totalTickets} |",
+        f"| Pending approval | {stats.pendingApproval} |",
+        f"| Compliant | {stats.compliant} |",
+        f"| Warning | {stats.warning} |",
+        f"| Non-compliant | {stats.nonCompliant} |",
+        "",
+        "### By Priority",
+        "",
+        "| Priority | Count |",
+        "|----------|-------|",
+    ]
+    lines += [f"| {p} | {stats.byPriority[p]} |" for p in PRIORITIES if p in stats.byPriority]
+    lines += [
+        "",
+        "### By Assignee",
+        "",
+        "| Assignee | Count |",
+        "|----------|-------|",
+    ]
+    lines += [f"| {name} | {count} |" for name, count in sorted(stats.byAssignee.items())]
+    return "\n".join(lines)
+
+
+def answer_detail(number: str) -> Optional[str]:
+    ticket = next((t for t in MOCK_TICKETS if t.number.lower() == number), None)
+    if ticket is None:
+        return None
+
+    lines = [
+        f"## **{ticket.number}**: {ticket.shortDescription}",
+        "",
+        "| Field | Value |",
+        "|-------|-------|",
+        f"| Assignee | {ticket.assignedTo} |",
+        f"| Priority | {ticket.priority} |",
+        f"| Status | {ticket.status} |",
+        f"| Compliance | {ticket.complianceStatus} |",
+        f"| Scheduled | {ticket.scheduledStartDate} to {ticket.scheduledEndDate} |",
+    ]
+    failed = [r for r in ticket.validationResults if not r.passed]
+    if not failed:
+        lines += ["", "All validation rules pass."]
+        return "\n".join(lines)
+
+    lines += [
+        "",
+        "### Failed Validations",
+        "",
+        "| Rule | Severity | Issue | How to Fix |",
+        "|------|----------|-------|------------|",
+    ]
+    lines += [f"| {r.rule} | {r.severity} | {r.message} | {r.suggestion} |" for r in failed]
+    return "\n".join(lines)
+
+
+def classify(message: str) -> Optional[tuple[str, str]]:
+    """Answer a chat message locally if it maps onto a known query.
+
+    Returns the intent name and a Markdown answer, or None when the message is
+    open-ended and should go to the model.
+    """
+    text = " ".join(message.lower().replace("?", " ").replace(".", " ").split())
+    entities, rest = extract_entities(REQUEST_OBJECT_PATTERN.sub(r"\1", text))
+    leftover = _leftover_words(rest)
+    numbers = entities["numbers"]
+
+    if len(numbers) == 1 and (DETAIL_PATTERN.search(text) or LIST_PATTERN.match(text)):
+        if leftover <= DETAIL_WORDS:
+            answer = answer_detail(numbers[0])
+            return ("ticket_detail", answer) if answer else None
+        return None
+
+    if numbers or not leftover <= FILLER_WORDS:
+        return None
+
+    has_filter = any(key in entities for key in ("status", "priority", "compliance", "assignee"))
+
+    if COUNT_PATTERN.match(text) and "ticket" in text:
+        return "count", answer_count(entities)
+    if STATS_PATTERN.search(text) and not has_filter:
+        return "stats", answer_stats()
+    if LIST_PATTERN.match(text) and "ticket" in text and (has_filter or " all " in f" {text} "):
+        return "list", answer_list(entities)
+    return None
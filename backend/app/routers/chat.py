@@ -1,13 +1,30 @@
 import os
 import json
+import asyncio
+import logging
 import boto3
+from botocore.config import Config
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from botocore.exceptions import NoCredentialsError, ClientError
 from app.mock_data import MOCK_TICKETS
+from app.conversations import CONVERSATIONS, ConversationSession
+from app.intents import ROUTING_METRICS, classify
+from app.scheduler import (
+    PRIORITY_BACKGROUND,
+    THROTTLING_ERROR_CODES,
+    UNAVAILABLE_ERROR_CODES,
+    ChatBusyError,
+    ChatScheduler,
+    get_fast_model,
+    get_max_concurrency,
+    select_model,
+)
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
+logger = logging.getLogger(__name__)
+
 
 def get_bedrock_region() -> str:
     """Get AWS region for Bedrock (defaults to us-east-1)."""
@@ -29,8 +46,17 @@ def get_bedrock_model() -> str:
     return os.getenv("BEDROCK_MODEL_ID", "us.amazon.nova-pro-v1:0")
 
 
+def get_bedrock_endpoint_url() -> str | None:
+    """Get a Bedrock endpoint override, e.g. a local fake server (None uses AWS)."""
+    return os.getenv("BEDROCK_ENDPOINT_URL")
+
+
 def create_bedrock_client():
-    """Create a boto3 bedrock-runtime client using configured credentials."""
+    """Create a boto3 bedrock-runtime client using configured credentials.
+
+    botocore's own retries are disabled; the chat scheduler retries throttled
+    calls itself so it can account for them against the concurrency cap.
+    """
     profile = get_bedrock_profile()
     region = get_bedrock_region()
 
@@ -38,8 +64,17 @@ def create_bedrock_client():
     if profile:
         session_kwargs["profile_name"] = profile
 
+    # Enough pooled connections for every model tier at full concurrency
+    config = Config(
+        retries={"total_max_attempts": 1, "mode": "standard"},
+        max_pool_connections=get_max_concurrency() * 2,
+    )
+
     boto_session = boto3.Session(**session_kwargs)
-    return boto_session.client("bedrock-runtime")
+    return boto_session.client("bedrock-runtime", endpoint_url=get_bedrock_endpoint_url(), config=config)
+
+
+SCHEDULER = ChatScheduler(create_bedrock_client)
 
 
 class ChatMessage(BaseModel):
@@ -48,11 +83,16 @@ class ChatMessage(BaseModel):
 
 
 class ChatRequest(BaseModel):
-    messages: list[ChatMessage]
+    # Either continue a session with just the new message, or send the full
+    # history (legacy clients), which seeds a new session.
+    sessionId: str | None = None
+    message: str | None = None
+    messages: list[ChatMessage] = []
 
 
 class ChatResponse(BaseModel):
     response: str
+    sessionId: str | None = None
 
 
 def get_tickets_context() -> str:
@@ -118,50 +158,140 @@ Formatting guidelines:
 - Always reference ticket numbers (CHG...) when discussing specific tickets"""
 
 
+SUMMARY_PROMPT = """Summarize the earlier part of a conversation between a controls team member and the compliance assistant.
+Keep decisions, open questions, and which tickets were discussed and why.
+Refer to tickets by number (CHG...) only; their details are already available to the assistant.
+Be concise: at most a short paragraph or a few bullet points."""
+
+
+def extract_text(response: dict) -> str:
+    """Concatenate the text blocks of a Converse API response."""
+    content = response.get("output", {}).get("message", {}).get("content", [])
+    return "".join(block["text"] for block in content if "text" in block)
+
+
+async def compact_session(session: ConversationSession) -> None:
+    """Fold turns beyond the history budget into the session's rolling summary.
+
+    Summaries are simple, so they run at background priority and use the fast
+    model tier when one is configured.
+    """
+    evict_count = session.evictable_count()
+    if not evict_count or session.compacting:
+        return
+
+    session.compacting = True
+    try:
+        evicted = session.messages[:evict_count]
+        transcript = "\n\n".join(f"{m['role']}: {m['content']}" for m in evicted)
+        if session.summary:
+            transcript = f"Summary so far:\n{session.summary}\n\nLater messages:\n{transcript}"
+
+        response = await SCHEDULER.converse(
+            priority=PRIORITY_BACKGROUND,
+            modelId=get_fast_model() or get_bedrock_model(),
+            system=[{"text": SUMMARY_PROMPT}],
+            messages=[{"role": "user", "content": [{"text": transcript}]}],
+            inferenceConfig={
+                "maxTokens": 512,
+                "temperature": 0.0,
+            }
+        )
+        summary = extract_text(response)
+        if summary:
+            session.fold(summary, evict_count)
+    finally:
+        session.compacting = False
+
+
+# Strong references to background compactions so they are not garbage collected
+_compaction_tasks: set[asyncio.Task] = set()
+
+
+def _compaction_done(task: asyncio.Task) -> None:
+    """Forget a finished compaction, logging any failure; it is retried next turn."""
+    _compaction_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Failed to compact chat session", exc_info=task.exception())
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Process a chat message and return AI response using AWS Bedrock."""
+    # Legacy clients resend the full history every turn, so they stay stateless
+    # instead of filling the session store with sessions that are never reused
+    stateless = not request.sessionId and bool(request.messages)
+
+    new_message = request.message
+    history = [msg.model_dump() for msg in request.messages] if stateless else []
+    if stateless and new_message is None and history[-1]["role"] == "user":
+        new_message = history.pop()["content"]
+
+    if not new_message:
+        raise HTTPException(status_code=400, detail="No message to send")
+
+    # New sessions stay detached until their first turn succeeds, so rejected
+    # or failed first turns never take (or evict) a slot in the store
+    if request.sessionId:
+        session = CONVERSATIONS.get(request.sessionId)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Chat session not found or expired")
+        is_new = False
+    else:
+        session = ConversationSession()
+        session.messages = history
+        is_new = not stateless
+    session_id = None if stateless else session.id
+
+    # Answer simple lookups (counts, filtered lists, ticket details) locally
+    local = classify(new_message)
+    if local:
+        intent, response_text = local
+        ROUTING_METRICS.record_local(intent)
+        session.append_turn(new_message, response_text)
+        if is_new:
+            CONVERSATIONS.add(session)
+        return ChatResponse(response=response_text, sessionId=session_id)
+    ROUTING_METRICS.record_model()
+
     try:
-        # Build the system prompt with current ticket data
-        system_prompt = SYSTEM_PROMPT.format(tickets_data=get_tickets_context())
-
-        # Convert messages to Bedrock Converse API format
-        messages = [
-            {"role": msg.role, "content": [{"text": msg.content}]}
-            for msg in request.messages
-        ]
-
-        # Create Bedrock client
-        bedrock_client = create_bedrock_client()
-        model_id = get_bedrock_model()
-
-        # Call Bedrock Converse API
-        response = bedrock_client.converse(
-            modelId=model_id,
-            system=[{"text": system_prompt}],
-            messages=messages,
+        # Build the system prompt with current ticket data, plus the rolling
+        # summary of turns that no longer fit the history budget
+        system = [{"text": SYSTEM_PROMPT.format(tickets_data=get_tickets_context())}]
+        if session.summary:
+            system.append({"text": f"Summary of the earlier conversation:\n{session.summary}"})
+
+        # Short, simple prompts go to the fast tier; the scheduler caps
+        # concurrency per model and coalesces identical in-flight requests
+        response = await SCHEDULER.converse(
+            modelId=select_model(new_message, session.history_tokens(), get_bedrock_model()),
+            system=system,
+            messages=session.prompt_messages(new_message),
             inferenceConfig={
                 "maxTokens": 1024,
                 "temperature": 0.0,
             }
         )
 
-        # Extract text response from Bedrock response
-        output = response.get("output", {})
-        message = output.get("message", {})
-        content = message.get("content", [])
-
-        # Extract text from content blocks
-        response_text = ""
-        for block in content:
-            if "text" in block:
-                response_text += block["text"]
+        response_text = extract_text(response)
 
         if not response_text:
             response_text = "I couldn't generate a response. Please try again."
 
-        return ChatResponse(response=response_text)
+        session.append_turn(new_message, response_text)
+        if is_new:
+            CONVERSATIONS.add(session)
+        if not stateless:
+            # The answer is already complete, so summarize in the background
+            # rather than holding the response behind a low-priority call
+            task = asyncio.create_task(compact_session(session))
+            _compaction_tasks.add(task)
+            task.add_done_callback(_compaction_done)
 
+        return ChatResponse(response=response_text, sessionId=session_id)
+
+    except ChatBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except NoCredentialsError:
         raise HTTPException(
             status_code=500,
@@ -176,6 +306,18 @@ async def chat(request: ChatRequest):
                 status_code=500,
                 detail=f"AWS credentials found but no access to Bedrock. Check IAM permissions. Error: {error_message}"
             )
+        elif error_code in THROTTLING_ERROR_CODES:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Bedrock is throttling requests. Please try again shortly. Error: {error_message}",
+                headers={"Retry-After": "5"}
+            )
+        elif error_code in UNAVAILABLE_ERROR_CODES:
+            raise HTTPException(
+                status_code=503,
+                detail=f"Bedrock model is temporarily unavailable. Please try again shortly. Error: {error_message}",
+                headers={"Retry-After": "5"}
+            )
         elif error_code == 'ValidationException':
             raise HTTPException(
                 status_code=500,
@@ -185,3 +327,17 @@ async def chat(request: ChatRequest):
             raise HTTPException(status_code=500, detail=f"Bedrock error: {error_message}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
+
+
+@router.get("/chat/metrics")
+def chat_metrics():
+    """Report chat routing counts and the scheduler's queue and call statistics."""
+    return {**ROUTING_METRICS.snapshot(), "scheduler": SCHEDULER.snapshot()}
+
+
+@router.delete("/chat/sessions/{session_id}")
+def delete_chat_session(session_id: str):
+    """Discard a chat session and its history."""
+    if not CONVERSATIONS.delete(session_id):
+        raise HTTPException(status_code=404, detail="Chat session not found or expired")
+    return {"deleted": session_id}
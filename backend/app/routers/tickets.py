@@ -1,10 +1,47 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import Literal, Optional
 from app.models import ChangeTicket, TicketListResponse, DashboardStats
 from app.mock_data import MOCK_TICKETS
+from app.export import EXPORT_MEDIA_TYPES, EXPORT_WRITERS, parquet_available
 
 router = APIRouter(prefix="/api", tags=["tickets"])
 
+SORT_KEY_MAP = {
+    "createdAt": lambda t: t.createdAt,
+    "priority": lambda t: {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}.get(t.priority, 4),
+    "compliance": lambda t: {"non-compliant": 0, "warning": 1, "compliant": 2}.get(t.complianceStatus, 3),
+    "scheduledStartDate": lambda t: t.scheduledStartDate,
+}
+
+
+def filter_tickets(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    compliance: Optional[str] = None,
+    assignee: Optional[str] = None,
+    sort_by: Optional[str] = "createdAt",
+    sort_order: Optional[str] = "desc",
+) -> list[ChangeTicket]:
+    """Return the tickets matching the given filters, sorted.
+
+    Only references to the stored tickets are collected, so the result costs one
+    pointer per match regardless of ticket size.
+    """
+    filtered = [
+        t for t in MOCK_TICKETS
+        if (not status or t.status == status)
+        and (not priority or t.priority == priority)
+        and (not compliance or t.complianceStatus == compliance)
+        and (not assignee or t.assignedTo == assignee)
+    ]
+
+    if sort_by in SORT_KEY_MAP:
+        reverse = sort_order == "desc"
+        filtered.sort(key=SORT_KEY_MAP[sort_by], reverse=reverse)
+
+    return filtered
+
 
 @router.get("/tickets", response_model=TicketListResponse)
 def list_tickets(
@@ -18,29 +55,7 @@ def list_tickets(
     page_size: int = Query(20, ge=1, le=100, description="Page size"),
 ):
     """List all tickets with optional filtering and sorting."""
-    filtered = MOCK_TICKETS.copy()
-
-    # Apply filters
-    if status:
-        filtered = [t for t in filtered if t.status == status]
-    if priority:
-        filtered = [t for t in filtered if t.priority == priority]
-    if compliance:
-        filtered = [t for t in filtered if t.complianceStatus == compliance]
-    if assignee:
-        filtered = [t for t in filtered if t.assignedTo == assignee]
-
-    # Apply sorting
-    sort_key_map = {
-        "createdAt": lambda t: t.createdAt,
-        "priority": lambda t: {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}.get(t.priority, 4),
-        "compliance": lambda t: {"non-compliant": 0, "warning": 1, "compliant": 2}.get(t.complianceStatus, 3),
-        "scheduledStartDate": lambda t: t.scheduledStartDate,
-    }
-
-    if sort_by in sort_key_map:
-        reverse = sort_order == "desc"
-        filtered.sort(key=sort_key_map[sort_by], reverse=reverse)
+    filtered = filter_tickets(status, priority, compliance, assignee, sort_by, sort_order)
 
     # Paginate
     total = len(filtered)
@@ -56,6 +71,35 @@ def list_tickets(
     )
 
 
+@router.get("/tickets/export")
+def export_tickets(
+    format: Literal["csv", "ndjson", "parquet"] = Query("csv", description="Export format"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    priority: Optional[str] = Query(None, description="Filter by priority"),
+    compliance: Optional[str] = Query(None, description="Filter by compliance status"),
+    assignee: Optional[str] = Query(None, description="Filter by assignee"),
+    sort_by: Optional[str] = Query("createdAt", description="Sort field"),
+    sort_order: Optional[str] = Query("desc", description="Sort order (asc/desc)"),
+):
+    """Stream every ticket matching the filters, with validation results, as a download.
+
+    Rows are serialized lazily from a generator; Starlette iterates it in a worker
+    thread and only pulls the next chunk once the client has accepted the previous
+    one, so memory stays flat and the event loop stays free for other requests.
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow. Run 'pip install pyarrow'.")
+
+    tickets = filter_tickets(status, priority, compliance, assignee, sort_by, sort_order)
+    rows = EXPORT_WRITERS[format](tickets)
+
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{format}"'},
+    )
+
+
 @router.get("/tickets/{ticket_id}", response_model=ChangeTicket)
 def get_ticket(ticket_id: str):
     """Get a single ticket by ID."""
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+from typing import Callable, Optional
+
+from botocore.exceptions import ClientError
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException",
+}
+UNAVAILABLE_ERROR_CODES = {
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+}
+RETRYABLE_ERROR_CODES = THROTTLING_ERROR_CODES | UNAVAILABLE_ERROR_CODES
+
+# Prompts mentioning these need reasoning, so they stay on the default model
+COMPLEX_PROMPT_PATTERN = re.compile(
+    r"\b(why|explain|how|fix|recommend|suggest|compare|analy[sz]e|plan|risk|should|improve|impact)\b",
+    re.IGNORECASE,
+)
+
+
+def get_max_concurrency() -> int:
+    """Get the maximum number of concurrent Bedrock calls per model."""
+    return int(os.getenv("CHAT_MAX_CONCURRENCY", "4"))
+
+
+def get_max_queue() -> int:
+    """Get the maximum number of chat requests waiting for a model slot."""
+    return int(os.getenv("CHAT_MAX_QUEUE", "50"))
+
+
+def get_max_retries() -> int:
+    """Get how many times a throttled or unavailable Bedrock call is retried."""
+    return int(os.getenv("CHAT_MAX_RETRIES", "4"))
+
+
+def get_fast_model() -> str:
+    """Get the Bedrock model ID used for short, simple prompts (empty, the default, disables tiering)."""
+    return os.getenv("BEDROCK_FAST_MODEL_ID", "")
+
+
+def get_fast_tier_max_chars() -> int:
+    """Get the longest prompt, in characters, still considered simple."""
+    return int(os.getenv("CHAT_FAST_TIER_MAX_CHARS", "200"))
+
+
+def get_fast_tier_max_history_tokens() -> int:
+    """Get the largest conversation history, in tokens, still sent to the fast tier."""
+    return int(os.getenv("CHAT_FAST_TIER_MAX_HISTORY_TOKENS", "500"))
+
+
+def select_model(prompt: str, history_tokens: int, default_model: str) -> str:
+    """Route short, simple prompts in short conversations to the fast tier, the rest to the default.
+
+    A brief follow-up deep in a long session still carries that session's
+    history, so the history size counts as much as the prompt itself.
+    """
+    fast_model = get_fast_model()
+    if not fast_model:
+        return default_model
+    if (
+        len(prompt) > get_fast_tier_max_chars()
+        or history_tokens > get_fast_tier_max_history_tokens()
+        or COMPLEX_PROMPT_PATTERN.search(prompt)
+    ):
+        return default_model
+    return fast_model
+
+
+def request_key(**converse_kwargs) -> str:
+    """Hash a Converse request.
+
+    The system prompt embeds the ticket data, so requests built from different
+    data never share a key.
+    """
+    payload = json.dumps(converse_kwargs, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 8.0) -> float:
+    """Full-jitter exponential backoff delay in seconds."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class ChatBusyError(Exception):
+    """Raised when the scheduler queue is full and a request cannot be admitted."""
+
+
+class ChatScheduler:
+    """Admission control for Bedrock Converse calls.
+
+    Calls are capped per model; callers beyond the cap wait in a bounded priority
+    queue. Identical in-flight requests share a single model call. Throttled or
+    briefly unavailable calls are retried with jittered backoff while holding
+    their slot, which also slows callers down while Bedrock is shedding load.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_retries: Optional[int] = None,
+    ):
+        self._client_factory = client_factory
+        self._client = None
+        self.max_concurrency = max_concurrency or get_max_concurrency()
+        self.max_queue = max_queue or get_max_queue()
+        self.max_retries = max_retries if max_retries is not None else get_max_retries()
+
+        self._active: dict[str, int] = {}
+        self._waiting: dict[str, list] = {}
+        self._queued = 0
+        self._sequence = itertools.count()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.rejected = 0
+        self.by_model: dict[str, int] = {}
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    async def converse(
+        self,
+        priority: int = PRIORITY_INTERACTIVE,
+        **converse_kwargs,
+    ) -> dict:
+        """Run a Converse call through the scheduler and return its response."""
+        key = request_key(**converse_kwargs)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._run(priority, converse_kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every waiter went away
+            task.exception()
+
+    async def _run(self, priority: int, converse_kwargs: dict) -> dict:
+        model_id = converse_kwargs["modelId"]
+        await self._acquire(model_id, priority)
+        try:
+            attempt = 0
+            while True:
+                self.calls += 1
+                self.by_model[model_id] = self.by_model.get(model_id, 0) + 1
+                try:
+                    return await asyncio.to_thread(self.client.converse, **converse_kwargs)
+                except ClientError as e:
+                    code = e.response.get("Error", {}).get("Code", "")
+                    if code not in RETRYABLE_ERROR_CODES or attempt >= self.max_retries:
+                        raise
+                self.retries += 1
+                await asyncio.sleep(backoff_delay(attempt))
+                attempt += 1
+        finally:
+            self._release(model_id)
+
+    async def _acquire(self, model_id: str, priority: int) -> None:
+        waiting = self._waiting.setdefault(model_id, [])
+        if self._active.get(model_id, 0) < self.max_concurrency and not waiting:
+            self._active[model_id] = self._active.get(model_id, 0) + 1
+            return
+
+        if self._queued >= self.max_queue:
+            self.rejected += 1
+            raise ChatBusyError("Too many chat requests are waiting. Please try again shortly.")
+
+        slot = asyncio.get_running_loop().create_future()
+        heapq.heappush(waiting, (priority, next(self._sequence), slot))
+        self._queued += 1
+        try:
+            await slot
+        except asyncio.CancelledError:
+            if slot.cancelled():
+                self._queued -= 1
+            else:
+                # The slot was handed over just as we were cancelled
+                self._release(model_id)
+            raise
+
+    def _release(self, model_id: str) -> None:
+        waiting = self._waiting.get(model_id, [])
+        while waiting:
+            _, _, slot = heapq.heappop(waiting)
+            if slot.cancelled():
+                continue
+            # Hand the slot straight to the next waiter
+            self._queued -= 1
+            slot.set_result(None)
+            return
+        self._active[model_id] -= 1
+
+    def snapshot(self) -> dict:
+        """Report queue depth, in-flight calls and retry/coalescing counts."""
+        return {
+            "active": dict(self._active),
+            "queued": self._queued,
+            "inflight": len(self._inflight),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "byModel": dict(self.by_model),
+        }
@@ -0,0 +1,85 @@
+"""Local fake of the Bedrock Converse API for exercising the chat scheduler.
+
+Run it alongside the API and point the backend at it:
+
+    uvicorn fake_bedrock:app --port 8001
+    BEDROCK_ENDPOINT_URL=http://localhost:8001 AWS_ACCESS_KEY_ID=fake \\
+        AWS_SECRET_ACCESS_KEY=fake uvicorn app.main:app
+
+Behaviour is tuned with environment variables:
+
+    FAKE_BEDROCK_LATENCY_MS      base latency per call (default 500)
+    FAKE_BEDROCK_JITTER_MS       random extra latency (default 200)
+    FAKE_BEDROCK_MAX_CONCURRENCY calls beyond this per model are throttled (default 8)
+    FAKE_BEDROCK_THROTTLE_RATE   fraction of other calls throttled at random (default 0)
+
+GET /stats reports calls, throttles and peak concurrency per model.
+"""
+import asyncio
+import os
+import random
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI(title="Fake Bedrock Converse API")
+
+stats: dict[str, dict[str, int]] = {}
+active: dict[str, int] = {}
+
+
+def get_env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def model_stats(model_id: str) -> dict[str, int]:
+    return stats.setdefault(model_id, {"calls": 0, "throttled": 0, "peakConcurrency": 0})
+
+
+def throttled(model_id: str) -> JSONResponse:
+    model_stats(model_id)["throttled"] += 1
+    return JSONResponse(
+        status_code=429,
+        content={"message": "Too many requests, please wait before trying again."},
+        headers={"x-amzn-ErrorType": "ThrottlingException"},
+    )
+
+
+@app.post("/model/{model_id:path}/converse")
+async def converse(model_id: str, request: Request):
+    body = await request.json()
+    counts = model_stats(model_id)
+
+    max_concurrency = int(get_env_float("FAKE_BEDROCK_MAX_CONCURRENCY", 8))
+    if active.get(model_id, 0) >= max_concurrency:
+        return throttled(model_id)
+    if random.random() < get_env_float("FAKE_BEDROCK_THROTTLE_RATE", 0):
+        return throttled(model_id)
+
+    counts["calls"] += 1
+    active[model_id] = active.get(model_id, 0) + 1
+    counts["peakConcurrency"] = max(counts["peakConcurrency"], active[model_id])
+    try:
+        latency_ms = get_env_float("FAKE_BEDROCK_LATENCY_MS", 500)
+        latency_ms += random.uniform(0, get_env_float("FAKE_BEDROCK_JITTER_MS", 200))
+        await asyncio.sleep(latency_ms / 1000)
+    finally:
+        active[model_id] -= 1
+
+    prompt = body["messages"][-1]["content"][0].get("text", "")
+    return {
+        "output": {
+            "message": {
+                "role": "assistant",
+                "content": [{"text": f"[{model_id}] Fake answer to: {prompt}"}],
+            }
+        },
+        "stopReason": "end_turn",
+        "usage": {"inputTokens": len(prompt) // 4, "outputTokens": 16, "totalTokens": len(prompt) // 4 + 16},
+        "metrics": {"latencyMs": int(latency_ms)},
+    }
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+
+from app.conversations import (
+    CONVERSATIONS,
+    MIN_RECENT_TURNS,
+    ConversationSession,
+    dedupe_ticket_tables,
+)
+from app.main import app
+from app.routers import chat
+
+BUDGET = 300
+
+
+def reply(text: str) -> dict:
+    return {"output": {"message": {"content": [{"text": text}]}}}
+
+
+class StubBedrock:
+    """Answers chat turns with a long reply and summaries with a short one."""
+
+    def __init__(self, on_summary=None, error_code=None):
+        self.on_summary = on_summary
+        self.error_code = error_code
+        self.summaries = 0
+
+    def converse(self, **kwargs):
+        if self.error_code:
+            raise ClientError({"Error": {"Code": self.error_code, "Message": "stub"}}, "Converse")
+        if kwargs["system"][0]["text"].startswith("Summarize"):
+            self.summaries += 1
+            if self.on_summary:
+                self.on_summary()
+            return reply(f"summary {self.summaries}")
+        return reply("x" * 400)
+
+
+@pytest.fixture
+def stub_bedrock(monkeypatch):
+    monkeypatch.setenv("CHAT_HISTORY_TOKEN_BUDGET", str(BUDGET))
+    monkeypatch.setattr(chat.SCHEDULER, "max_retries", 0)
+
+    def install(stub):
+        monkeypatch.setattr(chat.SCHEDULER, "_client", stub)
+        return stub
+
+    return install
+
+
+def test_dedupe_replaces_ticket_rows_with_reference():
+    content = (
+        "Here they are:\n"
+        "| Ticket | Status |\n"
+        "|--------|--------|\n"
+        "| **CHG0012345** | Approved |\n"
+        "| CHG0012346 | Rejected |\n"
+        "Let me know."
+    )
+
+    deduped = dedupe_ticket_tables(content)
+
+    assert "| **CHG0012345** | Approved |" not in deduped
+    assert "[table rows for CHG0012345, CHG0012346 omitted - see ticket data]" in deduped
+    assert deduped.startswith("Here they are:")
+    assert deduped.endswith("Let me know.")
+
+
+def test_append_turn_dedupes_only_the_previous_answer():
+    session = ConversationSession()
+    table = "| **CHG0012345** | Approved |"
+    session.append_turn("first", table)
+    session.append_turn("second", table)
+
+    assert "omitted" in session.messages[1]["content"]
+    assert session.messages[3]["content"] == table
+
+
+def test_evictable_count_keeps_recent_turns_in_pairs():
+    session = ConversationSession()
+    for i in range(6):
+        session.append_turn("q" * 400, "a" * 400)
+
+    evict_count = session.evictable_count(budget=0)
+
+    assert evict_count % 2 == 0
+    assert len(session.messages) - evict_count == MIN_RECENT_TURNS * 2
+
+
+def test_history_stays_within_budget_over_many_turns(stub_bedrock):
+    stub = stub_bedrock(StubBedrock())
+    session = ConversationSession()
+
+    for i in range(30):
+        session.append_turn(f"question {i} " + "q" * 200, "a" * 400)
+        asyncio.run(chat.compact_session(session))
+
+        assert session.messages[0]["role"] == "user"
+        assert (
+            session.history_tokens() <= BUDGET
+            or len(session.messages) == MIN_RECENT_TURNS * 2
+        )
+
+    assert stub.summaries > 0
+    assert session.summary == f"summary {stub.summaries}"
+    assert session.messages[-2]["content"].startswith("question 29 ")
+
+
+def test_turns_appended_during_compaction_survive_fold(stub_bedrock):
+    session = ConversationSession()
+    for i in range(4):
+        session.append_turn(f"old {i} " + "q" * 400, "a" * 400)
+    # Simulate another request finishing a turn while the summary is in flight
+    stub_bedrock(StubBedrock(on_summary=lambda: session.append_turn("during", "answer")))
+
+    asyncio.run(chat.compact_session(session))
+
+    assert session.summary == "summary 1"
+    assert session.messages[0]["role"] == "user"
+    assert session.messages[-2:] == [
+        {"role": "user", "content": "during"},
+        {"role": "assistant", "content": "answer"},
+    ]
+
+
+def test_empty_first_turn_does_not_create_a_session(stub_bedrock):
+    stub_bedrock(StubBedrock())
+    client = TestClient(app)
+    before = set(CONVERSATIONS._sessions)
+
+    assert client.post("/api/chat", json={"message": ""}).status_code == 400
+    assert client.post("/api/chat", json={}).status_code == 400
+
+    assert set(CONVERSATIONS._sessions) == before
+
+
+def test_failed_first_turn_does_not_create_a_session(stub_bedrock):
+    stub_bedrock(StubBedrock(error_code="ThrottlingException"))
+    client = TestClient(app)
+    before = set(CONVERSATIONS._sessions)
+
+    response = client.post("/api/chat", json={"message": "Explain the riskiest change"})
+
+    assert response.status_code == 429
+    assert set(CONVERSATIONS._sessions) == before
+
+
+def test_successful_first_turn_creates_a_session(stub_bedrock):
+    stub_bedrock(StubBedrock())
+    client = TestClient(app)
+
+    response = client.post("/api/chat", json={"message": "Explain the riskiest change"})
+
+    assert response.status_code == 200
+    session = CONVERSATIONS.get(response.json()["sessionId"])
+    assert session is not None
+    assert [m["role"] for m in session.messages] == ["user", "assistant"]
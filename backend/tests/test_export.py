@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import export
+from app.export import EXPORT_COLUMNS
+from app.main import app
+from app.mock_data import MOCK_TICKETS
+
+client = TestClient(app)
+
+NON_COMPLIANT = [t.number for t in MOCK_TICKETS if t.complianceStatus == "non-compliant"]
+
+
+def test_csv_export_applies_filters():
+    response = client.get("/api/tickets/export", params={"format": "csv", "compliance": "non-compliant"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert reader.fieldnames == EXPORT_COLUMNS
+    rows = list(reader)
+    assert sorted(r["number"] for r in rows) == sorted(NON_COMPLIANT)
+    assert all(r["failedValidations"] for r in rows)
+
+
+def test_csv_export_includes_every_ticket_without_filters():
+    response = client.get("/api/tickets/export")
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == len(MOCK_TICKETS)
+
+
+def test_ndjson_export_has_one_ticket_per_line():
+    response = client.get("/api/tickets/export", params={"format": "ndjson", "assignee": "Mike Johnson"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    tickets = [json.loads(line) for line in response.text.splitlines()]
+    expected = [t for t in MOCK_TICKETS if t.assignedTo == "Mike Johnson"]
+    assert len(tickets) == len(expected)
+    assert all(t["assignedTo"] == "Mike Johnson" for t in tickets)
+    assert all(len(t["validationResults"]) == 5 for t in tickets)
+
+
+def test_parquet_export_round_trips_across_row_groups(monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(export, "PARQUET_BATCH_SIZE", 3)
+
+    response = client.get("/api/tickets/export", params={"format": "parquet"})
+
+    assert response.status_code == 200
+    parquet_file = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet_file.metadata.num_row_groups > 1
+    table = parquet_file.read()
+    assert table.column_names == EXPORT_COLUMNS
+    assert sorted(table.column("number").to_pylist()) == sorted(t.number for t in MOCK_TICKETS)
+
+
+@pytest.mark.parametrize("writer", [export.iter_csv, export.iter_ndjson])
+def test_text_exports_are_chunked(monkeypatch, writer):
+    monkeypatch.setattr(export, "STREAM_CHUNK_SIZE", 4096)
+    tickets = MOCK_TICKETS * 20
+
+    chunks = list(writer(tickets))
+
+    assert len(chunks) > 1
+    # Every chunk but the last is flushed as soon as it passes the threshold
+    assert all(len(chunk) >= 4096 for chunk in chunks[:-1])
+    assert all(len(chunk) < 4096 + 4096 for chunk in chunks)
+    assert "".join(chunks).count("CHG") >= len(tickets)
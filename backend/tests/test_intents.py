@@ -0,0 +1,58 @@
+import pytest
+
+from app.intents import classify
+
+
+@pytest.mark.parametrize(
+    "message, intent",
+    [
+        ("How many tickets are pending approval?", "count"),
+        ("Which tickets are assigned to Mike Johnson?", "list"),
+        ("Show me all non-compliant tickets", "list"),
+        ("Show me high priority tickets", "list"),
+        ("Show me critical tickets", "list"),
+        ("Show me critical non-compliant tickets", "list"),
+        ("Why is CHG0012348 non-compliant?", "ticket_detail"),
+        ("Give me a summary", "stats"),
+    ],
+)
+def test_simple_queries_are_answered_locally(message, intent):
+    result = classify(message)
+    assert result is not None
+    assert result[0] == intent
+
+
+def test_count_applies_filters():
+    _, answer = classify("How many tickets are pending approval?")
+    assert "with status Pending Approval" in answer
+
+
+def test_count_of_one_uses_singular_noun():
+    _, answer = classify("How many tickets have been approved?")
+    assert answer.startswith("There is **1** ticket with status Approved.")
+
+
+def test_list_filters_by_assignee():
+    _, answer = classify("Which tickets are assigned to Mike Johnson?")
+    rows = [line for line in answer.splitlines() if line.startswith("| **CHG")]
+    assert rows
+    assert all("| Mike Johnson |" in row for row in rows)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "How many tickets are assigned to me?",
+        "Show me all my tickets",
+        "Show all tickets by priority",
+        "Show me all tickets that have been approved by Mike",
+        "What tickets do we own?",
+        "What tickets are scheduled for this week?",
+        "Which tickets are assigned to Bob Smith?",
+        "Which tickets are not compliant?",
+        "How do I fix CHG0012348?",
+        "What tickets have a high compliance?",
+    ],
+)
+def test_open_ended_queries_fall_back_to_model(message):
+    assert classify(message) is None
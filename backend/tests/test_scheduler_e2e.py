@@ -0,0 +1,120 @@
+"""End-to-end tests of the chat scheduler against the local fake Converse server."""
+import asyncio
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+import uvicorn
+
+import fake_bedrock
+from app.main import app
+from app.routers import chat
+from app.scheduler import ChatScheduler
+
+MODEL_ID = "us.amazon.nova-pro-v1:0"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def fake_server():
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(fake_bedrock.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        assert time.monotonic() < deadline, "fake Bedrock server did not start"
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=10)
+
+
+@pytest.fixture
+def use_fake_bedrock(fake_server, monkeypatch):
+    """Point a fresh scheduler at the fake server, configured per test."""
+    monkeypatch.setenv("BEDROCK_ENDPOINT_URL", fake_server)
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "fake")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "fake")
+    monkeypatch.delenv("AWS_PROFILE", raising=False)
+    monkeypatch.delenv("BEDROCK_PROFILE", raising=False)
+    monkeypatch.delenv("BEDROCK_FAST_MODEL_ID", raising=False)
+    monkeypatch.setenv("BEDROCK_MODEL_ID", MODEL_ID)
+    monkeypatch.setenv("FAKE_BEDROCK_LATENCY_MS", "100")
+    monkeypatch.setenv("FAKE_BEDROCK_JITTER_MS", "0")
+    monkeypatch.setenv("FAKE_BEDROCK_THROTTLE_RATE", "0")
+    monkeypatch.setenv("FAKE_BEDROCK_MAX_CONCURRENCY", "100")
+    fake_bedrock.stats.clear()
+    fake_bedrock.active.clear()
+
+    def configure(**scheduler_kwargs) -> ChatScheduler:
+        scheduler = ChatScheduler(chat.create_bedrock_client, **scheduler_kwargs)
+        monkeypatch.setattr(chat, "SCHEDULER", scheduler)
+        return scheduler
+
+    return configure
+
+
+def post_concurrently(messages: list[str]) -> list[httpx.Response]:
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            return await asyncio.gather(*[client.post("/api/chat", json={"message": m}) for m in messages])
+
+    return asyncio.run(run())
+
+
+def test_concurrency_is_capped_per_model(use_fake_bedrock, monkeypatch):
+    use_fake_bedrock(max_concurrency=2, max_queue=50)
+    # The fake throttles anything beyond the cap, so a leak would show up as throttles
+    monkeypatch.setenv("FAKE_BEDROCK_MAX_CONCURRENCY", "2")
+
+    responses = post_concurrently([f"Explain ticket trends {i}" for i in range(10)])
+
+    assert [r.status_code for r in responses] == [200] * 10
+    assert fake_bedrock.stats[MODEL_ID]["peakConcurrency"] <= 2
+    assert fake_bedrock.stats[MODEL_ID]["throttled"] == 0
+    assert fake_bedrock.stats[MODEL_ID]["calls"] == 10
+
+
+def test_identical_requests_share_one_upstream_call(use_fake_bedrock):
+    scheduler = use_fake_bedrock(max_concurrency=4, max_queue=50)
+
+    responses = post_concurrently(["Explain the riskiest change"] * 5)
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert len({r.json()["response"] for r in responses}) == 1
+    assert fake_bedrock.stats[MODEL_ID]["calls"] == 1
+    assert scheduler.coalesced == 4
+
+
+def test_persistent_throttling_returns_429(use_fake_bedrock, monkeypatch):
+    scheduler = use_fake_bedrock(max_concurrency=2, max_queue=50, max_retries=2)
+    monkeypatch.setenv("FAKE_BEDROCK_THROTTLE_RATE", "1")
+
+    [response] = post_concurrently(["Explain the riskiest change"])
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"]
+    assert scheduler.retries == 2
+    assert fake_bedrock.stats[MODEL_ID]["throttled"] == 3
+
+
+def test_full_queue_returns_503(use_fake_bedrock, monkeypatch):
+    scheduler = use_fake_bedrock(max_concurrency=1, max_queue=1)
+    monkeypatch.setenv("FAKE_BEDROCK_LATENCY_MS", "300")
+
+    responses = post_concurrently([f"Explain ticket trends {i}" for i in range(4)])
+
+    statuses = sorted(r.status_code for r in responses)
+    assert statuses == [200, 200, 503, 503]
+    busy = [r for r in responses if r.status_code == 503]
+    assert all(r.headers["Retry-After"] for r in busy)
+    assert scheduler.rejected == 2
@@ -4,7 +4,7 @@ import remarkGfm from "remark-gfm";
 import { Card, CardContent } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Send, Bot, User, Loader2 } from "lucide-react";
-import { sendChatMessage } from "@/services/api";
+import { ChatRequestError, sendChatMessage } from "@/services/api";
 
 interface Message {
   role: "user" | "assistant";
@@ -26,6 +26,7 @@ export function Chat() {
   ]);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  const sessionIdRef = useRef<string | undefined>(undefined);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
   const scrollToBottom = () => {
@@ -52,18 +53,19 @@ export function Chat() {
     setLoading(true);
 
     try {
-      // Send to API (exclude the initial greeting for context)
-      const apiMessages = newMessages.slice(1).map((m) => ({
-        role: m.role,
-        content: m.content,
-      }));
-
-      const response = await sendChatMessage(apiMessages);
+      // Only the new message is sent; the server keeps the session history
+      const response = await sendChatMessage(userMessage, sessionIdRef.current);
+      sessionIdRef.current = response.sessionId;
       setMessages([
         ...newMessages,
         { role: "assistant", content: response.response },
       ]);
     } catch (error) {
+      // Start a fresh session only if this one expired; keep it on transient
+      // errors such as throttling so the conversation is not lost
+      if (error instanceof ChatRequestError && error.status === 404) {
+        sessionIdRef.current = undefined;
+      }
       setMessages([
         ...newMessages,
         {
@@ -45,18 +45,29 @@ export interface ChatMessage {
 
 export interface ChatResponse {
   response: string;
+  sessionId?: string;
 }
 
-export async function sendChatMessage(messages: ChatMessage[]): Promise<ChatResponse> {
+export class ChatRequestError extends Error {
+  status: number;
+
+  constructor(message: string, status: number) {
+    super(message);
+    this.name = 'ChatRequestError';
+    this.status = status;
+  }
+}
+
+export async function sendChatMessage(message: string, sessionId?: string): Promise<ChatResponse> {
   const response = await fetch(`${API_BASE_URL}/chat`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
     },
-    body: JSON.stringify({ messages }),
+    body: JSON.stringify({ message, sessionId }),
   });
   if (!response.ok) {
-    throw new Error(`Chat failed: ${response.statusText}`);
+    throw new ChatRequestError(`Chat failed: ${response.statusText}`, response.status);
   }
   return response.json();
 }